@@ -1,4 +1,5 @@
 import json
+import logging
 import re
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
@@ -11,6 +12,60 @@ from extraction.prompts import (
 )
 
 
+# ─────────────────────────────────────────────────────────────
+# Compiled patterns (built once at import, reused per document)
+# ─────────────────────────────────────────────────────────────
+
+_SPECIAL_CHAR_RE = re.compile(r'[^A-Za-z\s]')
+_GARBAGE_RE = re.compile(r'(\d{5,}|[^A-Za-z\s]{3,})')
+
+_PARENT_PREFIX_RE = re.compile(r'^(श्री॰\s*|श्री\s*)')
+_PARENT_SUFFIX_RE = re.compile(r'\s*(यांना|यांची|यांचा|राहणार)$')
+_STUDENT_PREFIX_RE = re.compile(r'^(कुमारी\s*|कुमार\s*)')
+_STUDENT_SUFFIX_RE = re.compile(r'\s*(यांना|याना)$')
+_STUDENT_TRAILING_RE = re.compile(r'\s+(यांचा|यांची|यांना|राहणार).*$')
+_NAME_DIGIT_GARBAGE_RE = re.compile(r'[0-9०-९]{5,}')
+
+_STUDENT_SECTION_RE = re.compile(r'सदरचा दाखला[^\n]{0,300}')
+_STUDENT_SECTION_ALT_RE = re.compile(r'मुलग[ाी][^\n]{0,250}')
+
+# Student-name extraction patterns, most specific first (see
+# _cleanup_income_certificate for how they are applied)
+_STUDENT_NAME_PATTERNS = tuple(
+    (re.compile(pattern), description)
+    for pattern, description in [
+        (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80})$', 'यांची मुलगी कुमारी (end of line)'),
+        (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80})$', 'यांचा मुलगा कुमार (end of line)'),
+        (r'कुमारी\s+([^\n]{3,80}?)(?:\s+यांना|\s+शैक्षणिक|$)', 'कुमारी + flexible end'),
+        (r'कुमार\s+([^\n]{3,80}?)(?:\s+यांना|\s+शैक्षणिक|$)', 'कुमार + flexible end'),
+        (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)\s+यांना', 'यांचा मुलगा कुमार + यांना'),
+        (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)\s+यांना', 'यांचा मुलगा कुमार + यांना'),
+        (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80}?)\s+यांना', 'यांची मुलगी कुमारी + यांना'),
+        (r'यांचा\s+मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'यांचा मुलगा कुमार (flexible)'),
+        (r'यांची\s+मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'यांची मुलगी कुमारी (flexible)'),
+        (r'[ाी]चा\s+मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'merged word + मुलगा कुमार'),
+        (r'[ाी]ची\s+मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'merged word + मुलगी कुमारी'),
+        (r'मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'मुलगा कुमार'),
+        (r'मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'मुलगी कुमारी'),
+        (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80}?)(?:\s+यांना|\s+(?:यांच|शैक्षणिक))', 'यांची मुलगी (no यांना)'),
+        (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)(?:\s+यांना|\s+(?:यांच|शैक्षणिक))', 'यांचा मुलगा (no यांना)'),
+        (r'यांचा\s+मुलगा\s+(.{3,100}?)\s+यांना', 'यांचा मुलगा'),
+        (r'यांची\s+मुलगी\s+(.{3,100}?)\s+यांना', 'यांची मुलगी'),
+        (r'मुलगा\s+(.{3,100}?)\s+यांना', 'मुलगा only'),
+        (r'मुलगी\s+(.{3,100}?)\s+यांना', 'मुलगी only'),
+    ]
+)
+
+_YEAR_LINE_RE = re.compile(r'२०२[३४५].*?२०२[४५६]?[^\n]{0,100}')
+_NUMBER_TOKEN_RE = re.compile(r'[०-९0-9,.-]+')
+_INCOME_WORDS_LINE_RE = re.compile(r'२०२[३४५].*?[०-९0-9,.-]+\s+([^\n]{10,50})')
+_INCOME_WORD_PREFIX_RE = re.compile(r'^[०-९0-9,.\s]+')
+
+_DEVANAGARI_TO_ENGLISH = str.maketrans('०१२३४५६७८९', '0123456789')
+
+logger = logging.getLogger(__name__)
+
+
 class LlamaJSONExtractor:
     """Extract structured JSON from OCR text using Llama 3.1B"""
     
@@ -51,13 +106,14 @@ class LlamaJSONExtractor:
         prompt = create_extraction_prompt(raw_text, doc_type, schema)
 
         if 'S/D/H/O' in raw_text or 'S/D/H/o' in raw_text:
-            print(" DEBUG: Found S/D/H/O pattern in raw text")
-            lines = raw_text.split('\n')
-            for i, line in enumerate(lines):
-                if 'S/D/H/O' in line or 'S/D/H/o' in line:
-                    print(f"    Line {i}: {line}")
-                    if i + 1 < len(lines):
-                        print(f"    Next line: {lines[i+1]}")
+            logger.debug("Found S/D/H/O pattern in raw text")
+            if logger.isEnabledFor(logging.DEBUG):
+                lines = raw_text.split('\n')
+                for i, line in enumerate(lines):
+                    if 'S/D/H/O' in line or 'S/D/H/o' in line:
+                        logger.debug("    Line %d: %s", i, line)
+                        if i + 1 < len(lines):
+                            logger.debug("    Next line: %s", lines[i + 1])
         
         messages = [
             {
@@ -90,7 +146,7 @@ class LlamaJSONExtractor:
             outputs[0][input_ids.shape[-1]:], 
             skip_special_tokens=True
         )
-        print(f" DEBUG: LLM Response: {response[:500]}")
+        logger.debug("LLM Response: %s", response[:500])
         
         return self._parse_json_response(response, doc_type, raw_text)
     
@@ -108,9 +164,8 @@ class LlamaJSONExtractor:
         if 'parent_name' in data and data['parent_name']:
             parent_name_value = str(data['parent_name']).strip()
 
-            print(f" Validating parent_name: '{parent_name_value}'")
-            print(f" parent_name repr: {repr(parent_name_value)}")
-            print(f" parent_name length: {len(parent_name_value)}")
+            logger.debug("Validating parent_name: %r (length %d)",
+                         parent_name_value, len(parent_name_value))
 
             if not parent_name_value:  # Empty after strip
                 data['parent_name'] = None
@@ -125,9 +180,9 @@ class LlamaJSONExtractor:
         
             has_location = any(keyword in parent_name_upper for keyword in location_keywords)
 
-            if has_location:
+            if has_location and logger.isEnabledFor(logging.DEBUG):
                 matched_keywords = [kw for kw in location_keywords if kw in parent_name_upper]
-                print(f"     Found location keywords: {matched_keywords}")
+                logger.debug("     Found location keywords: %s", matched_keywords)
 
             # Check if parent_name appears in address (only if address is not empty)
             address = data.get('address', '')
@@ -135,30 +190,32 @@ class LlamaJSONExtractor:
             if address and len(parent_name_value) > 10:
                 in_address = parent_name_upper in address.upper()
                 if in_address:
-                    print(f"     Found in address: '{address}'")                
+                    logger.debug("     Found in address: %r", address)
         
-            special_char_count = len(re.findall(r'[^A-Za-z\s]', parent_name_value))
+            special_char_count = len(_SPECIAL_CHAR_RE.findall(parent_name_value))
             special_char_ratio = special_char_count / max(len(parent_name_value), 1)
         
             is_too_short = len(parent_name_value) < 4
             has_too_many_special_chars = special_char_ratio > 0.3
-            has_garbage = bool(re.search(r'(\d{5,}|[^A-Za-z\s]{3,})', parent_name_value))
+            has_garbage = bool(_GARBAGE_RE.search(parent_name_value))
         
             is_corrupted = is_too_short or has_too_many_special_chars or has_garbage
             if is_corrupted:
-                print(f"     Corruption check failed:")
-                print(f"       - Too short ({len(parent_name_value)} chars): {is_too_short}")
-                print(f"       - Too many special chars ({special_char_ratio:.2%}): {has_too_many_special_chars}")
-                print(f"       - Has garbage pattern: {has_garbage}")
+                logger.debug("     Corruption check failed:")
+                logger.debug("       - Too short (%d chars): %s", len(parent_name_value), is_too_short)
+                logger.debug("       - Too many special chars (%.2f%%): %s",
+                             special_char_ratio * 100, has_too_many_special_chars)
+                logger.debug("       - Has garbage pattern: %s", has_garbage)
 
             if has_location or in_address or is_corrupted:
-                print(f"  VALIDATION: Rejecting parent_name='{data['parent_name']}'")
+                logger.debug("  VALIDATION: Rejecting parent_name=%r", data['parent_name'])
                 if has_location:
-                    print(f"    Reason: Contains location keyword")
+                    logger.debug("    Reason: Contains location keyword")
                 if in_address:
-                    print(f"    Reason: Found in address field")
+                    logger.debug("    Reason: Found in address field")
                 if is_corrupted:
-                    print(f"    Reason: Appears corrupted (short={is_too_short}, special_chars={has_too_many_special_chars}, garbage={has_garbage})")
+                    logger.debug("    Reason: Appears corrupted (short=%s, special_chars=%s, garbage=%s)",
+                                 is_too_short, has_too_many_special_chars, has_garbage)
                 data['parent_name'] = None
     
         return data
@@ -166,26 +223,26 @@ class LlamaJSONExtractor:
     def _cleanup_income_certificate(self, data: dict, raw_text: str = "") -> dict:
         """Clean up common prefixes/suffixes in income certificate fields"""
         
-        print(f" _cleanup_income_certificate called")
-        print(f"   - Has raw_text: {bool(raw_text)} (length: {len(raw_text) if raw_text else 0})")
-        print(f"   - Current student_name: {repr(data.get('student_name'))}")
+        logger.debug("_cleanup_income_certificate called")
+        logger.debug("   - Has raw_text: %s (length: %d)", bool(raw_text), len(raw_text) if raw_text else 0)
+        logger.debug("   - Current student_name: %r", data.get('student_name'))
         
         # Clean parent_name
         if data.get('parent_name'):
             name = str(data['parent_name'])
             # Remove prefixes
-            name = re.sub(r'^(श्री॰\s*|श्री\s*)', '', name)
+            name = _PARENT_PREFIX_RE.sub('', name)
             # Remove suffixes
-            name = re.sub(r'\s*(यांना|यांची|यांचा|राहणार)$', '', name)
+            name = _PARENT_SUFFIX_RE.sub('', name)
             data['parent_name'] = name.strip() if name.strip() else None
             
         # Clean student_name
         if data.get('student_name'):
             name = str(data['student_name'])
             # Remove prefixes
-            name = re.sub(r'^(कुमारी\s*|कुमार\s*)', '', name)
+            name = _STUDENT_PREFIX_RE.sub('', name)
             # Remove suffixes
-            name = re.sub(r'\s*(यांना|याना)$', '', name)
+            name = _STUDENT_SUFFIX_RE.sub('', name)
             data['student_name'] = name.strip() if name.strip() else None
         
         # If student_name is null but text mentions मुलगा/मुलगी, try to extract it
@@ -196,78 +253,45 @@ class LlamaJSONExtractor:
             has_student_indicator = len(found_indicators) > 0
             
             if has_student_indicator:
-                print(f"  WARNING: Document mentions student but student_name is null")
-                print(f"    Found indicators: {found_indicators}")
-                print(f"    Attempting to extract student name...")
+                logger.debug("  WARNING: Document mentions student but student_name is null")
+                logger.debug("    Found indicators: %s", found_indicators)
+                logger.debug("    Attempting to extract student name...")
                 
                 # Show relevant portion of text for debugging (increased window)
-                student_section = re.search(r'सदरचा दाखला[^\n]{0,300}', raw_text)
+                student_section = _STUDENT_SECTION_RE.search(raw_text)
                 if student_section:
-                    print(f"    Text section: {student_section.group(0)}")
+                    logger.debug("    Text section: %s", student_section.group(0))
                 else:
                     # Try alternate search
-                    student_section = re.search(r'मुलग[ाी][^\n]{0,250}', raw_text)
+                    student_section = _STUDENT_SECTION_ALT_RE.search(raw_text)
                     if student_section:
-                        print(f"    Text section (alt): {student_section.group(0)}")
-                
-                # Try to extract student name using multiple regex patterns
-                # Order matters - try most specific patterns first
-                # IMPROVED: Allow for name to extend across line breaks and be more flexible with ending
-                patterns = [
-                    # Pattern 1: "यांचा मुलगा कुमार [NAME] यांना" - capture everything until यांना
-                    (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80})$', 'यांची मुलगी कुमारी (end of line)'),
-                    (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80})$', 'यांचा मुलगा कुमार (end of line)'),
-                    (r'कुमारी\s+([^\n]{3,80}?)(?:\s+यांना|\s+शैक्षणिक|$)', 'कुमारी + flexible end'),
-                    (r'कुमार\s+([^\n]{3,80}?)(?:\s+यांना|\s+शैक्षणिक|$)', 'कुमार + flexible end'),
-                    (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)\s+यांना', 'यांचा मुलगा कुमार + यांना'),
-                    (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)\s+यांना', 'यांचा मुलगा कुमार + यांना'),
-                    # Pattern 2: "यांची मुलगी कुमारी [NAME] यांना"
-                    (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80}?)\s+यांना', 'यांची मुलगी कुमारी + यांना'),
-                    # Pattern 3: More flexible - allow newlines and look for शैक्षणिक as terminator
-                    (r'यांचा\s+मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'यांचा मुलगा कुमार (flexible)'),
-                    (r'यांची\s+मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'यांची मुलगी कुमारी (flexible)'),
-                    # Pattern 4: Handle OCR error where यांचा is merged with previous word
-                    (r'[ाी]चा\s+मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'merged word + मुलगा कुमार'),
-                    (r'[ाी]ची\s+मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'merged word + मुलगी कुमारी'),
-                    # Pattern 5: "मुलगा कुमार [NAME] यांना"
-                    (r'मुलगा\s+कुमार\s+(.{3,100}?)\s+यांना', 'मुलगा कुमार'),
-                    # Pattern 6: "मुलगी कुमारी [NAME] यांना"
-                    (r'मुलगी\s+कुमारी\s+(.{3,100}?)\s+यांना', 'मुलगी कुमारी'),
-                    # Pattern 7: If यांना is missing, try capturing until शैक्षणिक or other terminators
-                    (r'यांची\s+मुलगी\s+कुमारी\s+([^\n]{3,80}?)(?:\s+यांना|\s+(?:यांच|शैक्षणिक))', 'यांची मुलगी (no यांना)'),
-                    (r'यांचा\s+मुलगा\s+कुमार\s+([^\n]{3,80}?)(?:\s+यांना|\s+(?:यांच|शैक्षणिक))', 'यांचा मुलगा (no यांना)'),
-                    # Pattern 8: Without कुमार/कुमारी prefix
-                    (r'यांचा\s+मुलगा\s+(.{3,100}?)\s+यांना', 'यांचा मुलगा'),
-                    (r'यांची\s+मुलगी\s+(.{3,100}?)\s+यांना', 'यांची मुलगी'),
-                    # Pattern 9: Most general - just मुलगा/मुलगी followed by name
-                    (r'मुलगा\s+(.{3,100}?)\s+यांना', 'मुलगा only'),
-                    (r'मुलगी\s+(.{3,100}?)\s+यांना', 'मुलगी only'),
-                ]
+                        logger.debug("    Text section (alt): %s", student_section.group(0))
                 
-                for i, (pattern, description) in enumerate(patterns, 1):
-                    match = re.search(pattern, raw_text)
+                # Try the precompiled extraction patterns, most specific first
+                for i, (pattern, description) in enumerate(_STUDENT_NAME_PATTERNS, 1):
+                    match = pattern.search(raw_text)
                     if match:
                         student_name = match.group(1).strip()
-                        print(f"    Pattern {i} ({description}) matched: '{student_name}'")
-                        
+                        logger.debug("    Pattern %d (%s) matched: %r", i, description, student_name)
+
                         # Clean up the extracted name
                         # Remove "कुमार" or "कुमारी" if still present at the start
-                        student_name = re.sub(r'^(कुमारी\s*|कुमार\s*)', '', student_name)
+                        student_name = _STUDENT_PREFIX_RE.sub('', student_name)
                         # Remove any trailing text after the actual name
-                        student_name = re.sub(r'\s+(यांचा|यांची|यांना|राहणार).*$', '', student_name)
+                        student_name = _STUDENT_TRAILING_RE.sub('', student_name)
                         # Clean up extra whitespace
                         student_name = ' '.join(student_name.split())
-                        
+
                         # Validate the extracted name
-                        if len(student_name) >= 2 and not re.search(r'[0-9०-९]{5,}', student_name):
-                            print(f"    ✓ Extracted student_name: '{student_name}'")
+                        if len(student_name) >= 2 and not _NAME_DIGIT_GARBAGE_RE.search(student_name):
+                            logger.debug("    ✓ Extracted student_name: %r", student_name)
                             data['student_name'] = student_name
                             break
                         else:
-                            print(f"    ✗ Name looks invalid (len={len(student_name)}): '{student_name}'")
-                
+                            logger.debug("    ✗ Name looks invalid (len=%d): %r", len(student_name), student_name)
+
                 if not data.get('student_name'):
-                    print(f"    ✗ Could not extract valid student_name from text")
+                    logger.debug("    ✗ Could not extract valid student_name from text")
             
         # IMPROVED validation for income_value with mixed numeral support
         if raw_text and data.get('income_value'):
@@ -277,8 +301,8 @@ class LlamaJSONExtractor:
             
             # Normalize both the extracted value and raw text for comparison
             # Convert Devanagari digits to English for comparison
-            devanagari_to_english = str.maketrans('०१२३४५६७८९', '0123456789')
-            
+            devanagari_to_english = _DEVANAGARI_TO_ENGLISH
+
             # Normalize the extracted income value
             income_normalized = income_val.translate(devanagari_to_english)
             income_normalized = income_normalized.replace(',', '').replace('.', '').replace(' ', '')
@@ -294,11 +318,11 @@ class LlamaJSONExtractor:
             # Check 1: Look for the normalized digits in normalized text
             if income_normalized in raw_text_normalized.replace(',', '').replace('.', '').replace(' ', ''):
                 found_in_text = True
-                print(f"✓ income_value '{income_val}' found in text (normalized match)")
+                logger.debug("✓ income_value %r found in text (normalized match)", income_val)
             
             # Check 2: Look for the year line and verify income appears there
             if not found_in_text:
-                year_match = re.search(r'२०२[३४५].*?२०२[४५६]?[^\n]{0,100}', raw_text)
+                year_match = _YEAR_LINE_RE.search(raw_text)
                 if year_match:
                     year_line = year_match.group(0)
                     year_line_normalized = year_line.translate(devanagari_to_english)
@@ -306,14 +330,14 @@ class LlamaJSONExtractor:
                     # Check if our income value appears in this line (after normalization)
                     if income_normalized in year_line_normalized.replace(',', '').replace('.', '').replace(' ', ''):
                         found_in_text = True
-                        print(f"✓ income_value '{income_val}' found in year line (normalized)")
+                        logger.debug("✓ income_value %r found in year line (normalized)", income_val)
                     else:
                         # Extract what's actually on that line
-                        actual_numbers = re.findall(r'[०-९0-9,.-]+', year_line)
+                        actual_numbers = _NUMBER_TOKEN_RE.findall(year_line)
                         if actual_numbers:
-                            print(f"  income_value '{income_val}' not exactly matched")
-                            print(f"   Year line contains: {year_line}")
-                            print(f"   Numbers found: {actual_numbers}")
+                            logger.debug("  income_value %r not exactly matched", income_val)
+                            logger.debug("   Year line contains: %s", year_line)
+                            logger.debug("   Numbers found: %s", actual_numbers)
                             
                             # Try fuzzy match - check if the significant digits are similar
                             for num in actual_numbers:
@@ -326,15 +350,15 @@ class LlamaJSONExtractor:
                                     income_normalized[:5] == num_normalized[:5]  # First 5 digits match
                                 ):
                                     found_in_text = True
-                                    print(f"   ✓ Found fuzzy match with '{num}' (normalized: {num_normalized})")
+                                    logger.debug("   ✓ Found fuzzy match with %r (normalized: %s)", num, num_normalized)
                                     break
-                            
+
                             if not found_in_text:
-                                print(f"   Setting income_value to null")
+                                logger.debug("   Setting income_value to null")
                                 data['income_value'] = None
-            
+
             if not found_in_text and data.get('income_value'):
-                print(f" income_value '{income_val}' does NOT exist in raw text - setting to null")
+                logger.debug("income_value %r does NOT exist in raw text - setting to null", income_val)
                 data['income_value'] = None
         
         # STRICT validation for income_in_word
@@ -355,25 +379,26 @@ class LlamaJSONExtractor:
             # If most words are found, consider it valid
             if matches >= len(word_parts) * 0.7:  # At least 70% of words must exist
                 words_in_text = True
-                print(f"✓ income_in_word '{income_word}' verified ({matches}/{len(word_parts)} words found)")
+                logger.debug("✓ income_in_word %r verified (%d/%d words found)",
+                             income_word, matches, len(word_parts))
             else:
                 # Try to find what's actually written
-                year_match = re.search(r'२०२[३४५].*?[०-९0-9,.-]+\s+([^\n]{10,50})', raw_text)
+                year_match = _INCOME_WORDS_LINE_RE.search(raw_text)
                 if year_match:
                     actual_words = year_match.group(1).strip()
-                    print(f" income_in_word '{income_word}' NOT found in text!")
-                    print(f"   Text actually says: '{actual_words}'")
-                    print(f"   Setting income_in_word to null")
+                    logger.debug("income_in_word %r NOT found in text!", income_word)
+                    logger.debug("   Text actually says: %r", actual_words)
+                    logger.debug("   Setting income_in_word to null")
                     data['income_in_word'] = None
                 else:
-                    print(f" income_in_word '{income_word}' NOT verified - setting to null")
+                    logger.debug("income_in_word %r NOT verified - setting to null", income_word)
                     data['income_in_word'] = None
         
         # Clean income_in_word - remove any stray digits or incorrect prefixes
         if data.get('income_in_word'):
             words = str(data['income_in_word'])
             # Remove leading digits/numbers and common OCR errors
-            words = re.sub(r'^[०-९0-9,.\s]+', '', words)
+            words = _INCOME_WORD_PREFIX_RE.sub('', words)
             data['income_in_word'] = words.strip() if words.strip() else None
         
         return data
@@ -416,7 +441,7 @@ class LlamaJSONExtractor:
                 json_str = cleaned[start_arr:end_arr + 1]
                 parsed_array = json.loads(json_str)
                 
-                print(f"  LLM returned array instead of object. Converting...")
+                logger.debug("LLM returned array instead of object. Converting...")
                 
                 # Convert array to object based on schema
                 schema = get_schema_for_doc_type(doc_type)
@@ -433,7 +458,7 @@ class LlamaJSONExtractor:
                 if 'document_type' not in parsed:
                     parsed['document_type'] = doc_type
                     
-                print(f"✓ Converted array to object: {list(parsed.keys())}")
+                logger.debug("✓ Converted array to object: %s", list(parsed.keys()))
                 
                 parsed = self._validate_and_fix_extraction(parsed, raw_text)
                 return parsed
@@ -441,15 +466,15 @@ class LlamaJSONExtractor:
             raise ValueError("No JSON object or array found in response")
                 
         except json.JSONDecodeError as e:
-            print(f" JSON parsing error: {e}")
-            print(f"Raw response: {response[:500]}")
+            logger.warning("JSON parsing error: %s", e)
+            logger.debug("Raw response: %s", response[:500])
             return {
                 "error": "JSON parsing failed",
                 "document_type": doc_type,
                 "raw_response": response[:1000]
             }
         except Exception as e:
-            print(f" Unexpected error: {e}")
+            logger.warning("Unexpected error: %s", e)
             return {
                 "error": str(e),
                 "document_type": doc_type,
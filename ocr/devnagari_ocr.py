@@ -1,12 +1,27 @@
-import easyocr
-import cv2
+import concurrent.futures
+import contextlib
 import os
-import numpy as np
-from pdf2image import convert_from_path
-from PIL import Image
-import torch
-import unicodedata
 import re
+import unicodedata
+
+import numpy as np
+
+# easyocr, torch, cv2 and pdf2image are several seconds of import time;
+# they are pulled in lazily inside the functions that need them so that
+# importing this module (e.g. via the OCR router) stays cheap
+
+
+# Combining characters (matras, viramas, anusvara...) that a bad PDF text
+# layer tends to separate from their base consonant with a space; spelled
+# as escapes so the marks don't render detached in the source
+_COMB_CHARS = (
+    '\u0902\u0901\u0903'          # anusvara, candrabindu, visarga
+    '\u093e\u093f\u0940\u0941\u0942'  # aa, i, ii, u, uu matras
+    '\u0947\u0948\u094b\u094c'    # e, ai, o, au matras
+    '\u094d\u0945\u0949'          # virama, candra e/o
+)
+_DEVA_FIX_RE = re.compile(f'[ \u00a0]+([{_COMB_CHARS}])')
+_MULTI_SPACE_RE = re.compile(r'  +')
 
 
 def normalize_devanagari_text(text: str) -> str:
@@ -16,24 +31,20 @@ def normalize_devanagari_text(text: str) -> str:
     """
     if not text:
         return text
-    
+
+    # Pure-ASCII lines can't need NFC or matra fixes - skip both passes
+    if text.isascii():
+        return _MULTI_SPACE_RE.sub(' ', text)
+
     # Unicode NFC normalization - combines characters properly
     normalized = unicodedata.normalize('NFC', text)
-    
-    # Additional fixes for common PDF text layer issues
-    fixes = {
-        ' ं': 'ं',    ' ँ': 'ँ',    ' ः': 'ः',    ' ा': 'ा',
-        ' ि': 'ि',    ' ी': 'ी',    ' ु': 'ु',    ' ू': 'ू',
-        ' े': 'े',    ' ै': 'ै',    ' ो': 'ो',    ' ौ': 'ौ',
-        ' ्': '्',    ' ॅ': 'ॅ',    ' ॉ': 'ॉ',
-    }
-    
-    for wrong, right in fixes.items():
-        normalized = normalized.replace(wrong, right)
-    
+
+    # Re-attach separated combining characters in one pass
+    normalized = _DEVA_FIX_RE.sub(r'\1', normalized)
+
     # Remove extra spaces (but preserve single spaces)
-    normalized = re.sub(r'  +', ' ', normalized)
-    
+    normalized = _MULTI_SPACE_RE.sub(' ', normalized)
+
     return normalized
 
 
@@ -43,103 +54,169 @@ def group_text_by_lines(result, line_threshold=25):
     """
     if not result:
         return []
-    
-    # Extract bounding boxes and text
-    detections = []
-    for detection in result:
-        # EasyOCR returns: (bbox, text, confidence)
+
+    # EasyOCR returns: (bbox, text, confidence)
+    # Pull the geometry into NumPy arrays so sorting and line segmentation
+    # run in vectorized C instead of per-detection Python dicts
+    n = len(result)
+    ys = np.empty(n, dtype=np.float64)
+    xs = np.empty(n, dtype=np.float64)
+    for i, detection in enumerate(result):
         bbox = detection[0]
-        text = detection[1]
-        confidence = detection[2]
-        
-        # Get vertical center of bbox
-        y_center = (bbox[0][1] + bbox[2][1]) / 2
-        x_left = bbox[0][0]
-        detections.append({
-            'text': text,
-            'confidence': confidence,
-            'y': y_center,
-            'x': x_left,
-            'bbox': bbox
-        })
-    
+        # Vertical center of bbox
+        ys[i] = (bbox[0][1] + bbox[2][1]) / 2
+        xs[i] = bbox[0][0]
+
     # Sort by vertical position first, then horizontal
-    detections.sort(key=lambda d: (d['y'], d['x']))
-    
-    # Group into lines
+    order = np.lexsort((xs, ys))
+    ys_sorted = ys[order]
+
+    # Each line is anchored at its first detection: a new line starts at
+    # the first y-center line_threshold or more past the anchor. This
+    # bounds the line height - chaining consecutive gaps instead would
+    # let a tilted scan merge many lines transitively. searchsorted
+    # jumps straight to every break, one O(log n) step per line
+    breaks = []
+    anchor = 0
+    while True:
+        anchor = int(np.searchsorted(
+            ys_sorted, ys_sorted[anchor] + line_threshold, side='left'
+        ))
+        if anchor >= n:
+            break
+        breaks.append(anchor)
+
+    # Only materialize the per-detection dicts once the grouping is known
     lines = []
-    current_line = []
-    current_y = None
-    
-    for det in detections:
-        if current_y is None:
-            current_y = det['y']
-            current_line.append(det)
-        elif abs(det['y'] - current_y) < line_threshold:
-            # Same line
-            current_line.append(det)
-        else:
-            # New line
-            if current_line:
-                # Sort current line by x position
-                current_line.sort(key=lambda d: d['x'])
-                lines.append(current_line)
-            current_line = [det]
-            current_y = det['y']
-    
-    # Add last line
-    if current_line:
-        current_line.sort(key=lambda d: d['x'])
-        lines.append(current_line)
-    
+    for line_indices in np.split(order, breaks):
+        line_indices = sorted(line_indices, key=lambda i: xs[i])
+        lines.append([
+            {
+                'text': result[i][1],
+                'confidence': result[i][2],
+                'y': float(ys[i]),
+                'x': float(xs[i]),
+                'bbox': result[i][0]
+            }
+            for i in line_indices
+        ])
+
     return lines
 
 
-def is_income_certificate_text(text: str) -> bool:
+_ICERT_STRONG_KEYWORDS = (
+    "उत्पन्नाचे प्रमाणपत्र",
+    "वर्षासाठी उत्पन्नाचे प्रमाणपत्र",
+    "आय प्रमाणपत्र",
+    "प्रमाणित करण्यात येते",
+    "प्रमाणित किया जाता है"
+)
+
+_ICERT_MEDIUM_KEYWORDS = (
+    "उत्पन्न",
+    "प्रमाणपत्र",
+    "तलाठी",
+    "तहसील",
+    "जिल्हा",
+    "महसूल",
+    "अर्जदार",
+    "कुटुंब"
+)
+
+_ICERT_AMOUNT_RE = re.compile(r"[₹]?\s?[0-9०-९,]+")
+_ICERT_YEAR_RE = re.compile(r"[0-9०-९]{4}")
+
+# Optional: pyahocorasick scores every keyword in one pass over the text
+# instead of one substring scan per keyword
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+if ahocorasick is not None:
+    _ICERT_AC = ahocorasick.Automaton()
+    for _kw in _ICERT_STRONG_KEYWORDS:
+        _ICERT_AC.add_word(_kw, (_kw, 3))
+    for _kw in _ICERT_MEDIUM_KEYWORDS:
+        _ICERT_AC.add_word(_kw, (_kw, 1))
+    _ICERT_AC.make_automaton()
+else:
+    _ICERT_AC = None
+
+
+def is_income_certificate_text(text: str, normalized: bool = False) -> bool:
+    """Keyword-score the text; pass normalized=True when the caller has
+    already run it through normalize_devanagari_text"""
     if not text or len(text.strip()) < 50:
         return False
 
-    text = normalize_devanagari_text(text)
-    score = 0
-
-    strong_keywords = [
-        "उत्पन्नाचे प्रमाणपत्र",
-        "वर्षासाठी उत्पन्नाचे प्रमाणपत्र",
-        "आय प्रमाणपत्र",
-        "प्रमाणित करण्यात येते",
-        "प्रमाणित किया जाता है"
-    ]
-
-    medium_keywords = [
-        "उत्पन्न",
-        "प्रमाणपत्र",
-        "तलाठी",
-        "तहसील",
-        "जिल्हा",
-        "महसूल",
-        "अर्जदार",
-        "कुटुंब"
-    ]
-
-    for kw in strong_keywords:
-        if kw in text:
-            score += 3
-
-    for kw in medium_keywords:
-        if kw in text:
-            score += 1
+    if not normalized:
+        text = normalize_devanagari_text(text)
+
+    if _ICERT_AC is not None:
+        # Single scan; dedupe per keyword so repeats don't inflate the score
+        hits = {kw: points for _end, (kw, points) in _ICERT_AC.iter(text)}
+        score = sum(hits.values())
+        if score >= 5:
+            return True
+    else:
+        score = 0
+        for kw in _ICERT_STRONG_KEYWORDS:
+            if kw in text:
+                score += 3
+                if score >= 5:
+                    return True
+        for kw in _ICERT_MEDIUM_KEYWORDS:
+            if kw in text:
+                score += 1
+                if score >= 5:
+                    return True
 
     # Amount (supports Devanagari + English digits)
-    if re.search(r"[₹]?\s?[0-9०-९,]+", text):
+    if _ICERT_AMOUNT_RE.search(text):
         score += 2
 
     # Year detection
-    if re.search(r"[0-9०-९]{4}", text):
+    if _ICERT_YEAR_RE.search(text):
         score += 1
 
     return score >= 5
 
 
+# Optional: pypdfium2 renders PDF pages straight into NumPy buffers,
+# skipping the PIL image + np.array copy that the poppler path pays
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+
+# Both render paths rasterize at the same resolution so OCR quality
+# doesn't depend on whether pypdfium2 is installed
+_PDF_RENDER_DPI = 200
+
+
+def _render_pdf_pages(path):
+    """Render a PDF into a list of RGB ndarrays, one per page"""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            # pdfium scale is relative to 72 dpi PDF points
+            return [
+                page.render(scale=_PDF_RENDER_DPI / 72,
+                            rev_byteorder=True).to_numpy()
+                for page in pdf
+            ]
+        finally:
+            pdf.close()
+    # Fallback: poppler via pdf2image, rasterizing pages in parallel
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(path, dpi=_PDF_RENDER_DPI,
+                               thread_count=os.cpu_count() or 1)
+    return [np.array(img) for img in images]
+
+
 # Initialize EasyOCR reader (lazy loading)
 _reader = None
 
@@ -147,51 +224,92 @@ def get_reader():
     """Lazy load the EasyOCR reader"""
     global _reader
     if _reader is None:
+        import easyocr
+        import torch
+
         use_gpu = torch.cuda.is_available()
         print(f" Initializing EasyOCR reader (GPU: {use_gpu})")
         if use_gpu:
             print(f"   GPU: {torch.cuda.get_device_name(0)}")
+        # On CPU, EasyOCR's default quantize=True already gives dynamic
+        # int8 inference; on GPU we run the reader under fp16 autocast
+        # (see _inference_context) to halve tensor memory traffic
         _reader = easyocr.Reader(['en', 'hi'], gpu=use_gpu)
+        if use_gpu:
+            # Document pages arrive at recurring shapes, so let cuDNN
+            # autotune and cache the fastest kernels after warmup
+            torch.backends.cudnn.benchmark = True
     return _reader
 
 
+def _inference_context():
+    """torch.inference_mode everywhere, plus fp16 autocast on CUDA"""
+    import torch
+
+    stack = contextlib.ExitStack()
+    # Skip autograd bookkeeping entirely - OCR is pure inference
+    stack.enter_context(torch.inference_mode())
+    if torch.cuda.is_available():
+        stack.enter_context(torch.autocast('cuda', dtype=torch.float16))
+    return stack
+
+
+def _append_confident_lines(result, full_text):
+    """Group one page's detections into lines and keep the confident ones"""
+    lines = group_text_by_lines(result)
+    for line in lines:
+        avg_confidence = sum([det['confidence'] for det in line]) / len(line)
+        if avg_confidence > 0.25:
+            text = normalize_devanagari_text(
+                ' '.join(d['text'] for d in line)
+            )
+            full_text.append(text)
+
+
 def run_income_certificate_ocr(file_path):
     """
     Wrapper used by router
     """
-    reader = get_reader()  # Lazy load reader
     path = str(file_path)
+    is_pdf = path.lower().endswith('.pdf')
+
+    # Decode the document in the background while the (possibly cold)
+    # EasyOCR reader loads; costs nothing when the reader is already warm
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        if is_pdf:
+            load_future = pool.submit(_render_pdf_pages, path)
+        else:
+            import cv2
+
+            load_future = pool.submit(cv2.imread, path)
+        reader = get_reader()  # Lazy load reader
+        loaded = load_future.result()
 
     full_text = []
 
     # Process based on file type
-    if path.lower().endswith('.pdf'):
-        images = convert_from_path(path)
-        for img in images:
-            img = np.array(img)
-            result = reader.readtext(img, detail=1)
-            lines = group_text_by_lines(result)
-            for line in lines:
-                avg_confidence = sum([det['confidence'] for det in line]) / len(line)
-                if avg_confidence > 0.25:
-                    text = normalize_devanagari_text(
-                        ' '.join(d['text'] for d in line)
-                    )
-                    full_text.append(text)
+    if is_pdf:
+        # One batched forward pass over all pages instead of one
+        # reader.readtext call (and GPU launch) per page. readtext_batched
+        # np.stacks the pages, so it only works when every page has the
+        # same shape; mixed-size PDFs fall back to the per-page loop
+        with _inference_context():
+            if len({page.shape for page in loaded}) == 1:
+                page_results = reader.readtext_batched(loaded, detail=1)
+            else:
+                page_results = [
+                    reader.readtext(page, detail=1) for page in loaded
+                ]
+        for result in page_results:
+            _append_confident_lines(result, full_text)
     else:
-        img = cv2.imread(path)
-        result = reader.readtext(img, detail=1)
-        lines = group_text_by_lines(result)
-        for line in lines:
-            avg_confidence = sum([det['confidence'] for det in line]) / len(line)
-            if avg_confidence > 0.25:
-                text = normalize_devanagari_text(
-                    ' '.join(d['text'] for d in line)
-                )
-                full_text.append(text)
+        with _inference_context():
+            result = reader.readtext(loaded, detail=1)
+        _append_confident_lines(result, full_text)
 
     final_text = '\n'.join(full_text)
-    detected = is_income_certificate_text(final_text)
+    # Lines were normalized as they were collected - skip re-normalizing
+    detected = is_income_certificate_text(final_text, normalized=True)
 
     return {
         'text': final_text,
@@ -205,6 +323,9 @@ def run_income_certificate_ocr(file_path):
 # TEST CODE - Only runs when file is executed directly
 # ============================================================================
 if __name__ == "__main__":
+    import cv2
+    from pdf2image import convert_from_path
+
     print("\n" + "="*80)
     print("RUNNING TEST MODE")
     print("="*80 + "\n")
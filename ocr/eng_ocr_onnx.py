@@ -0,0 +1,129 @@
+"""
+Optional ONNX Runtime backend for the DocTR predictor
+
+The OCR workload is repeated inference over fixed-shape image tensors,
+which ONNX Runtime serves with less overhead than eager PyTorch (and
+with the CUDA execution provider when available). The detection and
+recognition backbones are exported once to .onnx files next to the OCR
+cache and wrapped so DocTR's own pre/post-processing keeps running
+unchanged.
+
+Enabled via the environment variable KEF_OCR_BACKEND=onnx; anything
+that goes wrong (onnxruntime missing, export failure) falls back to
+the eager PyTorch predictor in eng_ocr.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+from doctr.models import ocr_predictor
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+_ONNX_DIR = Path(__file__).resolve().parent.parent / '.onnx_models'
+
+
+def _export_backbone(model, dummy_input, onnx_path: Path):
+    """Export one backbone to ONNX with a dynamic batch dimension"""
+    if not onnx_path.exists():
+        _ONNX_DIR.mkdir(exist_ok=True)
+        torch.onnx.export(
+            model,
+            dummy_input,
+            str(onnx_path),
+            input_names=['input'],
+            output_names=['output'],
+            dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+        )
+    return ort.InferenceSession(
+        str(onnx_path), providers=ort.get_available_providers()
+    )
+
+
+class _OrtBackbone(torch.nn.Module):
+    """Drop-in for a DocTR backbone: ORT session for the forward pass,
+    the original model's postprocessor for decoding"""
+
+    def __init__(self, session, postprocessor):
+        super().__init__()
+        self.session = session
+        self.postprocessor = postprocessor
+        self.input_name = session.get_inputs()[0].name
+
+    def forward(self, x, return_model_output=False, return_preds=True,
+                **kwargs):
+        out_map = self.session.run(
+            None, {self.input_name: x.cpu().numpy()}
+        )[0]
+
+        out = {}
+        if return_model_output:
+            out['out_map'] = torch.from_numpy(out_map)
+        if return_preds:
+            out['preds'] = self.postprocessor(out_map)
+        return out
+
+
+def load_onnx_predictor():
+    """
+    Build a DocTR predictor whose det/reco backbones run on ONNX Runtime
+
+    Returns None when onnxruntime is unavailable or the export fails, so
+    the caller can fall back to the eager PyTorch predictor.
+    """
+    if ort is None:
+        return None
+
+    try:
+        # Same predictor settings as the eager path in eng_ocr
+        predictor = ocr_predictor(
+            pretrained=True, det_bs=4, reco_bs=1024,
+            assume_straight_pages=True
+        )
+
+        det_model = predictor.det_predictor.model.eval()
+        reco_model = predictor.reco_predictor.model.eval()
+
+        print(" Loading ONNX Runtime backend "
+              f"(providers: {ort.get_available_providers()})")
+
+        det_session = _export_backbone(
+            det_model,
+            torch.zeros((1, 3, 1024, 1024)),
+            _ONNX_DIR / 'doctr_det.onnx'
+        )
+        reco_session = _export_backbone(
+            reco_model,
+            torch.zeros((1, 3, 32, 128)),
+            _ONNX_DIR / 'doctr_reco.onnx'
+        )
+
+        predictor.det_predictor.model = _OrtBackbone(
+            det_session, det_model.postprocessor
+        )
+        predictor.reco_predictor.model = _OrtBackbone(
+            reco_session, reco_model.postprocessor
+        )
+
+        # One dummy page end to end: the try/except above only covers
+        # export/load, and a backbone swap that breaks at inference
+        # time (e.g. a postprocessor expecting tensors) must surface
+        # here, not on the first real request
+        predictor([np.zeros((640, 640, 3), dtype=np.uint8)])
+
+        print("✓ DocTR backbones running on ONNX Runtime")
+        return predictor
+
+    except Exception as e:
+        print(f" ONNX backend unavailable ({e})")
+        return None
+
+
+def onnx_backend_requested() -> bool:
+    """True when the KEF_OCR_BACKEND env var asks for ONNX serving"""
+    return os.environ.get('KEF_OCR_BACKEND', '').lower() == 'onnx'
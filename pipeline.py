@@ -28,6 +28,11 @@ def run_full_pipeline(file_path: Path):
 
 
 if __name__ == "__main__":
+    from ocr.eng_ocr import warmup
+
+    # Pay model load + first-inference cost before touching the file
+    warmup()
+
     file_path = Path(
         r"C:\Users\Admin\Desktop\KJSS\Income certificate of 2024-25  (File responses)\11936443___Anshika Prajapati___2025.pdf"
     )
@@ -1,11 +1,48 @@
+import functools
+import logging
 import re
-from collections import Counter
 
-DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
-ENGLISH_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+import numpy as np
 
+# Optional: numba compiles the per-word byte statistics to native code;
+# without it a pure-Python/regex fallback computes the same numbers
+try:
+    import numba
+except ImportError:
+    numba = None
 
-MARKSHEET_KEYWORDS = {
+# Routing verdicts are debug-level: the formatting and the stdout lock
+# both disappear under the default logging config
+logger = logging.getLogger(__name__)
+
+# Byte classification table: ASCII whitespace \u2192 ' ', everything else \u2192
+# 'x'. Applied to the UTF-8 encoding of the text it lets token counts
+# come from C-level byte scans instead of allocating text.split() lists
+_WS_OR_TEXT = bytes.maketrans(
+    bytes(range(256)),
+    bytes(32 if b < 128 and chr(b).isspace() else 120 for b in range(256)),
+)
+
+
+def _byte_token_count(encoded: bytes) -> int:
+    """Number of whitespace-separated tokens in a UTF-8 buffer"""
+    collapsed = encoded.translate(_WS_OR_TEXT)
+    if not collapsed:
+        return 0
+    # A token starts at every whitespace\u2192text transition
+    return collapsed.count(b' x') + (collapsed[0:1] == b'x')
+
+
+def _count_devanagari(encoded: bytes) -> int:
+    """Devanagari character count from a UTF-8 buffer
+
+    Every char in U+0900-U+097F is 3 UTF-8 bytes starting 0xE0 0xA4 or
+    0xE0 0xA5, so two memchr scans count them without a regex findall.
+    """
+    return encoded.count(b'\xe0\xa4') + encoded.count(b'\xe0\xa5')
+
+
+MARKSHEET_KEYWORDS = frozenset({
     'statement of marks',
     'secondary school certificate',
     'certificate examination',
@@ -24,44 +61,181 @@ MARKSHEET_KEYWORDS = {
     'social sciences',
     'ssc',
     'hsc'
-}
+})
 
 
 
 
 # Common words in financial documents
-FINANCIAL_KEYWORDS = {
+FINANCIAL_KEYWORDS = frozenset({
     'bank', 'account', 'name', 'address', 'branch', 'code', 'number',
     'customer', 'date', 'mobile', 'email', 'ifsc', 'micr', 'nominee',
     'occupation', 'student', 'manager', 'details', 'contact', 'mumbai',
     'maharashtra', 'india', 'canara', 'opened', 'building', 'floor',
-}
+})
 
-COMMON_WORDS = {
-    'the', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had','Marks','Subject Name'
+# Entries are lowercase because every lookup is on a lowercased word
+COMMON_WORDS = frozenset({
+    'the', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'marks', 'subject name',
     'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must',
     'can', 'this', 'that', 'these', 'those', 'and', 'or', 'but', 'if', 'because',
-    'of', 'at', 'by', 'for', 'with', 'about', 'to', 'from', 'in', 'on', 'off','Mothers Name',"MOTHER'S NAME","MATHEMATICS"
-}
+    'of', 'at', 'by', 'for', 'with', 'about', 'to', 'from', 'in', 'on', 'off', 'mothers name', "mother's name", 'mathematics'
+})
 
 # Common Devanagari OCR artifacts (from bad Marathi/Hindi OCR)
-DEVANAGARI_OCR_ARTIFACTS = {
+DEVANAGARI_OCR_ARTIFACTS = frozenset({
     'THIOT', 'REUIR', 'foleel', 'Ridle', 'mocal', 'HGRIa', 'JUCR', 'HPIFT',
     'fholdd', 'gyfa', 'Vobdet', 'chFIG4aiCI', 'yuda', 'yiarra', 'aypfias',
     'VIUITT', 'prIdt', 'gradt', '3TET', '3TEIRIGR', 'gefle', 'asardo',
     'shHich', 'gAo', 'dethes', 'CRUIIT', 'geitldleryald', 'fucerferprta',
     'Meeldsiferbr', 'pRloe', 'Rasooce', 'Saat', 'Rasta', 'Guruji', 'chooece',
     'GrTgqut', 'HGRAT', 'GrGOT', 'mocal', 'chFIG', 'yarda', 'prIdt'
+})
+
+# One pass over maximal alnum runs replaces the separate word,
+# digit-letter-mix and single-letter regex scans: each token is
+# classified once by cheap string predicates instead of re-scanning
+# the full text per pattern
+_TOKEN_RE = re.compile(r'[A-Za-z0-9_]+')
+_DIGITS = '0123456789'
+
+
+# 5+ consecutive consonants never occur in real English words
+_BAD_CLUSTER_RE = re.compile(r'[bcdfghjklmnpqrstvwxyz]{5,}', re.IGNORECASE)
+
+# Byte-per-entry consonant table; indexing it is one memory load per
+# char instead of a membership test against a 21-char string
+_CONSONANT_TABLE = np.zeros(256, dtype=np.uint8)
+for _c in b'bcdfghjklmnpqrstvwxyzBCDFGHJKLMNPQRSTVWXYZ':
+    _CONSONANT_TABLE[_c] = 1
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _word_stats_kernel(word_bytes, offsets, eligible, consonant_table):
+        """Per-word stats over NUL-joined ASCII words in one native loop
+
+        offsets[i] is the cumulative length including the separator, so
+        word i spans [offsets[i-1], offsets[i] - 1). eligible[i] gates
+        the all-caps counter (length and keyword checks stay in Python).
+        """
+        bad_clusters = 0
+        total_len = 0
+        caps = 0
+        start = 0
+        for i in range(offsets.shape[0]):
+            end = offsets[i] - 1
+            consecutive = 0
+            max_run = 0
+            all_upper = True
+            for j in range(start, end):
+                b = word_bytes[j]
+                if consonant_table[b]:
+                    consecutive += 1
+                    if consecutive > max_run:
+                        max_run = consecutive
+                else:
+                    consecutive = 0
+                if b < 0x41 or b > 0x5A:
+                    all_upper = False
+            if max_run >= 5:
+                bad_clusters += 1
+            if all_upper and eligible[i]:
+                caps += 1
+            total_len += end - start
+            start = offsets[i]
+        return bad_clusters, total_len, caps
+
+
+def _word_stats(words, eligible):
+    """(bad_cluster_count, total_word_length, unusual_caps_count)
+
+    words carry their original case; eligible[i] says whether word i may
+    count toward the unusual all-caps total.
+    """
+    if numba is not None and words:
+        word_bytes = np.frombuffer(
+            ('\x00'.join(words) + '\x00').encode('ascii', 'replace'),
+            dtype=np.uint8
+        )
+        offsets = np.cumsum(
+            np.fromiter((len(w) + 1 for w in words), dtype=np.int32,
+                        count=len(words))
+        )
+        eligible_arr = np.fromiter(eligible, dtype=np.uint8,
+                                   count=len(words))
+        bad, total_len, caps = _word_stats_kernel(
+            word_bytes, offsets, eligible_arr, _CONSONANT_TABLE
+        )
+        return int(bad), int(total_len), int(caps)
+
+    bad = sum(1 for w in words if _BAD_CLUSTER_RE.search(w))
+    total_len = sum(len(w) for w in words)
+    caps = sum(1 for w, ok in zip(words, eligible) if ok and w.isupper())
+    return bad, total_len, caps
+
+
+_COMMON_OR_FINANCIAL = frozenset(COMMON_WORDS | FINANCIAL_KEYWORDS)
+
+
+# Optional: pyahocorasick finds every keyword in one pass over the text
+# instead of one substring scan per keyword
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_automaton(keywords):
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+if ahocorasick is not None:
+    _MARKSHEET_AC = _build_automaton(MARKSHEET_KEYWORDS)
+    _ARTIFACT_AC = _build_automaton(DEVANAGARI_OCR_ARTIFACTS)
+else:
+    _MARKSHEET_AC = None
+    _ARTIFACT_AC = None
+
+# Artifacts bucketed by first char so the substring fallback can skip
+# whole buckets after one memchr per bucket key
+_ARTIFACT_BY_FIRST_CHAR = {}
+for _a in DEVANAGARI_OCR_ARTIFACTS:
+    _ARTIFACT_BY_FIRST_CHAR.setdefault(_a[0], []).append(_a)
+_ARTIFACT_BY_FIRST_CHAR = {
+    k: tuple(v) for k, v in _ARTIFACT_BY_FIRST_CHAR.items()
 }
 
 
-def is_marksheet(text: str) -> bool:
-    text_l = text.lower()
-    hits = sum(1 for kw in MARKSHEET_KEYWORDS if kw in text_l)
+def _artifact_count(text):
+    """Number of distinct Devanagari OCR artifacts present in the text"""
+    if _ARTIFACT_AC is not None:
+        # Single scan; dedupe so a repeated artifact counts once
+        return len({a for _end, a in _ARTIFACT_AC.iter(text)})
+    count = 0
+    for first, artifacts in _ARTIFACT_BY_FIRST_CHAR.items():
+        if first in text:
+            count += sum(1 for a in artifacts if a in text)
+    return count
+
+
+# Memoized: is_gibberish_or_devanagari asks about the same text twice
+# per page, and retried pages re-ask with identical input
+@functools.lru_cache(maxsize=256)
+def is_marksheet(text: str, already_lower: bool = False) -> bool:
+    text_l = text if already_lower else text.lower()
+    if _MARKSHEET_AC is not None:
+        # Single scan; dedupe so a repeated keyword counts once
+        hits = len({kw for _end, kw in _MARKSHEET_AC.iter(text_l)})
+    else:
+        hits = sum(1 for kw in MARKSHEET_KEYWORDS if kw in text_l)
 
     # Marksheets are very distinctive
     if hits >= 3:
-        print(f"  Marksheet detected ({hits} strong signals)")
+        logger.debug("  Marksheet detected (%d strong signals)", hits)
         return True
 
     return False
@@ -69,6 +243,43 @@ def is_marksheet(text: str) -> bool:
 
 
 
+def _scan_tokens(text, text_lower):
+    """One streaming pass over the alnum runs of a page
+
+    Collects the original-case word list, the unique lowercased words,
+    the caps-eligibility flags and the digit-letter-mix / single-letter
+    counts, instead of one regex scan per statistic. Scanning text_lower
+    means no per-word .lower(); the original-case word comes from
+    slicing text at the same span (valid whenever lowercasing preserved
+    the length, which ASCII does). The actual all-caps test happens
+    inside _word_stats alongside the cluster scan.
+
+    Returns (words, unique_words, eligible, mixed_count, single_count).
+    """
+    same_len = len(text_lower) == len(text)
+    words = []
+    unique_words = set()
+    eligible = []
+    mixed_count = 0
+    single_count = 0
+    for m in _TOKEN_RE.finditer(text_lower):
+        t = m.group()
+        if t.isalpha():
+            if len(t) >= 3:
+                words.append(text[m.start():m.end()] if same_len else t)
+                unique_words.add(t)
+                eligible.append(
+                    len(t) > 4 and same_len
+                    and t not in _COMMON_OR_FINANCIAL
+                )
+            elif len(t) == 1:
+                single_count += 1
+        elif ((t[-1].isdigit() and t.rstrip(_DIGITS).isalpha())
+                or (t[0].isdigit() and t.lstrip(_DIGITS).isalpha())):
+            mixed_count += 1
+    return words, unique_words, eligible, mixed_count, single_count
+
+
 def is_gibberish_or_devanagari(text: str) -> bool:
     """
     Detect TRUE gibberish or Devanagari text.
@@ -76,113 +287,187 @@ def is_gibberish_or_devanagari(text: str) -> bool:
     """
     if not text or len(text.strip()) < 50:
         if text and is_marksheet(text):
-             print("   🎓 Short text but marksheet → forcing ENGLISH OCR")
+             logger.debug("   Short text but marksheet → forcing ENGLISH OCR")
              return False
         return True
     
     text = text.strip()
     total_chars = len(text)
 
-    if is_marksheet(text):
-        print("   🎓 Marksheet detected → not gibberish, use English OCR")
+    # One lowercasing pass feeds the marksheet scans and the per-word
+    # lookups below instead of a fresh .lower() at every use site
+    text_lower = text.lower()
+
+    # The marksheet override runs first: even a bilingual marksheet with
+    # plenty of Devanagari must stay on the English OCR path
+    if is_marksheet(text_lower, already_lower=True):
+        logger.debug("   Marksheet detected → not gibberish, use English OCR")
         return False
-    
+
+    # One encode feeds the C-level byte counts below instead of
+    # re-scanning the whole string per check
+    encoded = text.encode('utf-8', 'replace')
+    token_count = _byte_token_count(encoded)
+
     # 1. Devanagari check - if >5% Devanagari, definitely switch
-    devanagari_chars = len(DEVANAGARI_RE.findall(text))
+    devanagari_chars = _count_devanagari(encoded)
     if devanagari_chars / total_chars > 0.05:
-        print(f"   ✓ Devanagari detected: {devanagari_chars}/{total_chars} chars ({devanagari_chars/total_chars:.1%})")
+        logger.debug("   ✓ Devanagari detected: %d/%d chars (%.1f%%)",
+                     devanagari_chars, total_chars,
+                     100 * devanagari_chars / total_chars)
         return True
-    
-    # 2. Extract words
-    words = ENGLISH_WORD_RE.findall(text)
-    if len(words) < 20:
-        print(f"   ✓ Too few words: {len(words)} < 20")
-        return True
-    
-    word_list = [w.lower() for w in words]
-    unique_words = set(word_list)
-    
-    # 3. NEW: Check for Devanagari OCR artifacts (CRITICAL!)
+
+    # 2. Check for Devanagari OCR artifacts (CRITICAL!)
     # These are telltale signs of badly OCR'd Marathi/Hindi text
-    artifact_matches = sum(1 for artifact in DEVANAGARI_OCR_ARTIFACTS if artifact in text)
+    artifact_matches = _artifact_count(text)
     if artifact_matches >= 3:
-        print(f"   ✓ Found {artifact_matches} Devanagari OCR artifacts")
+        logger.debug("   ✓ Found %d Devanagari OCR artifacts", artifact_matches)
         return True
-    
-    # 4. NEW: Check for excessive digit-letter mixing (huge red flag)
+
+    # 3. Tokenize - one streaming pass collects everything steps 4-10
+    # need (see _scan_tokens)
+    words, unique_words, eligible, mixed_count, single_letter_count = \
+        _scan_tokens(text, text_lower)
+
+    if len(words) < 20:
+        logger.debug("   ✓ Too few words: %d < 20", len(words))
+        return True
+
+    # 4. Check for excessive digit-letter mixing (huge red flag)
     # Patterns like: 3n4ch, R1ET, 46/m, 9g, 4T
-    digit_letter_pattern = re.compile(r'\b(?:[0-9]+[a-zA-Z]+|[a-zA-Z]+[0-9]+)\b')
-    mixed_words = digit_letter_pattern.findall(text)
-    mixed_ratio = len(mixed_words) / max(len(text.split()), 1)
-    
+    # (the count came out of the token pass above). This rejects before
+    # the financial-keyword accept: badly OCR'd Devanagari passbooks
+    # still carry English "bank/account" labels
+    mixed_ratio = mixed_count / max(token_count, 1)
+
     if mixed_ratio > 0.25:  # >25% of tokens have digit-letter mixing
-        print(f"   ✓ Excessive digit-letter mixing: {mixed_ratio:.1%} ({len(mixed_words)} occurrences)")
+        logger.debug("   ✓ Excessive digit-letter mixing: %.1f%% (%d occurrences)",
+                     100 * mixed_ratio, mixed_count)
         return True
-    
+
     # 5. Check for financial/document keywords (IMPORTANT!)
     # If we find financial keywords, it's likely a real document with OCR errors
     financial_word_count = sum(1 for w in unique_words if w in FINANCIAL_KEYWORDS)
     if financial_word_count >= 3:  # Found 3+ financial keywords
-        print(f"   ✗ Found {financial_word_count} financial keywords - likely real document")
+        logger.debug("   ✗ Found %d financial keywords - likely real document",
+                     financial_word_count)
         return False  # It's a real document, not gibberish
-    
+
     # 6. Check for common English words
     common_word_count = sum(1 for w in unique_words if w in COMMON_WORDS)
-    if common_word_count < 5 and not is_marksheet(text):
-        print(f"   ✓ Too few common words: {common_word_count} < 5")
+    if common_word_count < 5 and not is_marksheet(text_lower,
+                                                  already_lower=True):
+        logger.debug("   ✓ Too few common words: %d < 5", common_word_count)
         return True
     
+    # One fused per-word pass produces the caps count for step 7, the
+    # cluster count for step 8 and the length sum for step 10
+    bad_cluster_count, total_word_len, unusual_caps_count = \
+        _word_stats(words, eligible)
+
     # 7. NEW: Check for unusual capital letter patterns
-    # Real English has predictable capitalization; gibberish has random caps
-    caps_pattern = re.compile(r'\b[A-Z]+\b')
-    all_caps_words = caps_pattern.findall(text)
-    # Filter out reasonable acronyms (2-4 letters) and check remaining
-    unusual_caps = [w for w in all_caps_words if len(w) > 4 and w.lower() not in COMMON_WORDS | FINANCIAL_KEYWORDS]
-    unusual_caps_ratio = len(unusual_caps) / max(len(words), 1)
-    
+    # Real English has predictable capitalization; gibberish has random
+    # caps. Short acronyms (2-4 letters) were already filtered out in
+    # the word pass above
+    unusual_caps_ratio = unusual_caps_count / max(len(words), 1)
+
     if unusual_caps_ratio > 0.20:  # >20% unusual all-caps words
-        print(f"   ✓ Unusual capitalization: {unusual_caps_ratio:.1%} ({len(unusual_caps)} words)")
+        logger.debug("   ✓ Unusual capitalization: %.1f%% (%d words)",
+                     100 * unusual_caps_ratio, unusual_caps_count)
         return True
-    
+
     # 8. Consonant cluster check (stricter)
-    # Only flag if MANY words have impossible clusters
-    bad_cluster_count = 0
-    for word in words:
-        consonants = 'bcdfghjklmnpqrstvwxyz'
-        consecutive = 0
-        max_consecutive = 0
-        for char in word.lower():
-            if char in consonants:
-                consecutive += 1
-                max_consecutive = max(max_consecutive, consecutive)
-            else:
-                consecutive = 0
-        # Only count truly impossible clusters (5+)
-        if max_consecutive >= 5:
-            bad_cluster_count += 1
-    
+    # Only count words with truly impossible clusters (5+ consonants)
+
     # More than 30% of words have impossible clusters
     if bad_cluster_count / len(words) > 0.30:
-        print(f"   ✓ Impossible consonant clusters: {bad_cluster_count}/{len(words)} words ({bad_cluster_count/len(words):.1%})")
+        logger.debug("   ✓ Impossible consonant clusters: %d/%d words (%.1f%%)",
+                     bad_cluster_count, len(words),
+                     100 * bad_cluster_count / len(words))
         return True
     
     # 9. NEW: Single letter "words" check
     # Gibberish often has many scattered single letters
-    single_letter_pattern = re.compile(r'\b[a-zA-Z]\b')
-    single_letters = single_letter_pattern.findall(text)
-    single_letter_ratio = len(single_letters) / max(len(text.split()), 1)
-    
+    single_letter_ratio = single_letter_count / max(token_count, 1)
+
     if single_letter_ratio > 0.15:  # >15% single letters
-        print(f"   ✓ Too many single letters: {single_letter_ratio:.1%} ({len(single_letters)} occurrences)")
+        logger.debug("   ✓ Too many single letters: %.1f%% (%d occurrences)",
+                     100 * single_letter_ratio, single_letter_count)
         return True
     
     # 10. Word length check
-    word_lengths = [len(w) for w in words]
-    avg_length = sum(word_lengths) / len(word_lengths)
+    avg_length = total_word_len / len(words)
     if avg_length < 2.5 or avg_length > 12:
-        print(f"   ✓ Unusual average word length: {avg_length:.1f}")
+        logger.debug("   ✓ Unusual average word length: %.1f", avg_length)
         return True
     
     # If we got here, it seems like reasonably clean English
-    print(f"   ✗ Appears to be valid English (passed all checks)")
-    return False
\ No newline at end of file
+    logger.debug("   ✗ Appears to be valid English (passed all checks)")
+    return False
+
+
+def _page_stats(text):
+    """Raw routing statistics for one page (batch path, no early exits)"""
+    stripped = text.strip() if text else ''
+    total_chars = len(stripped)
+    if total_chars < 50:
+        is_ms = bool(text) and is_marksheet(text)
+        return (1.0, float(is_ms)) + (0.0,) * 10
+
+    text_lower = stripped.lower()
+    is_ms = is_marksheet(text_lower, already_lower=True)
+
+    encoded = stripped.encode('utf-8', 'replace')
+    token_count = _byte_token_count(encoded)
+    dev_ratio = _count_devanagari(encoded) / total_chars
+
+    artifacts = _artifact_count(stripped)
+
+    words, unique_words, eligible, mixed, singles = \
+        _scan_tokens(stripped, text_lower)
+
+    financial = sum(1 for w in unique_words if w in FINANCIAL_KEYWORDS)
+    common = sum(1 for w in unique_words if w in COMMON_WORDS)
+    bad_clusters, total_word_len, unusual_caps_count = \
+        _word_stats(words, eligible)
+
+    n_words = max(len(words), 1)
+    n_tokens = max(token_count, 1)
+    return (0.0, float(is_ms), dev_ratio, float(artifacts),
+            float(len(words)), float(financial), mixed / n_tokens,
+            float(common), unusual_caps_count / n_words,
+            bad_clusters / n_words, singles / n_tokens,
+            total_word_len / n_words)
+
+
+def classify_pages(texts):
+    """
+    Batch version of is_gibberish_or_devanagari for a list of page texts.
+
+    Per-page statistics are gathered with the same single-pass scanners,
+    then every threshold is applied at once as vectorized NumPy
+    comparisons, so the verdict combination costs a few C loops for the
+    whole job instead of Python branching per page.
+    """
+    if not texts:
+        return []
+
+    stats = np.array([_page_stats(t) for t in texts], dtype=np.float32)
+    (short, is_ms, dev_ratio, artifacts, n_words, financial, mixed_ratio,
+     common, caps_ratio, cluster_ratio, single_ratio, avg_len) = stats.T
+    is_ms = is_ms > 0
+
+    # Same precedence as the scalar function: a marksheet verdict vetoes
+    # everything, the digit-letter-mixing reject outranks the
+    # financial-keyword accept, and financial keywords veto only the
+    # remaining noise heuristics
+    noisy = (
+        (common < 5) | (caps_ratio > 0.20) | (cluster_ratio > 0.30)
+        | (single_ratio > 0.15) | (avg_len < 2.5) | (avg_len > 12)
+    )
+    verdict = ~is_ms & (
+        (dev_ratio > 0.05) | (artifacts >= 3) | (n_words < 20)
+        | (mixed_ratio > 0.25) | ((financial < 3) & noisy)
+    )
+    verdict = np.where(short > 0, ~is_ms, verdict)
+    return [bool(v) for v in verdict]
\ No newline at end of file